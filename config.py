@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Final
 import os
 
 
@@ -28,6 +28,10 @@ class Settings(BaseSettings):
     min_withdrawal_amount: float = 10.0
     max_withdrawal_amount: float = 5000.0
     
+    # Admin dashboard settings
+    dashboard_stats_refresh_interval: int = 30  # Seconds between dashboard_stats refreshes
+    admin_cache_ttl: int = 30  # Seconds admin responses are served from cache
+    
     # Supported sports
     supported_sports: list = ["football", "basketball", "tennis", "hockey", "volleyball"]
     
@@ -36,4 +40,10 @@ class Settings(BaseSettings):
     rebit_emcy_api_key: str = os.getenv("REBIT_EMCY_API_KEY", "your-rebit-emcy-api-key")
     
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+# Frozen copies of hot-path settings (plain module constants skip BaseSettings attribute access)
+SECRET_KEY: Final[str] = settings.secret_key
+ALGORITHM: Final[str] = settings.algorithm
+BOOKIE_MARGIN: Final[float] = settings.bookie_margin
+WITHDRAWAL_LOCK_DURATION: Final[int] = settings.withdrawal_lock_duration
\ No newline at end of file
@@ -1,11 +1,13 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
+import asyncio
 import uvicorn
 
 from config import settings
 from src.api import router as api_router
 from src.models import database
+from src.services import betting_service
 
 app = FastAPI(
     title=settings.app_name,
@@ -26,9 +28,23 @@ app.add_middleware(
 async def startup():
     # Initialize database
     await database.init_db()
+    # Restore the in-memory service deposit counter from the bets table
+    async with database.AsyncSessionLocal() as session:
+        await betting_service.load_total_service_deposit(session)
+    # Keep the materialized dashboard stats fresh in the background
+    app.state.dashboard_stats_task = asyncio.create_task(
+        database.run_dashboard_stats_refresher(settings.dashboard_stats_refresh_interval)
+    )
+    # Drop expired withdrawal locks in the background
+    app.state.lock_purger_task = asyncio.create_task(
+        betting_service.locked_users.run_purger(settings.withdrawal_lock_duration)
+    )
 
 @app.on_event("shutdown")
 async def shutdown():
+    # Stop the background tasks
+    app.state.dashboard_stats_task.cancel()
+    app.state.lock_purger_task.cancel()
     # Close database connections
     await database.close_db()
 
@@ -1,179 +1,221 @@
-from fastapi import APIRouter, Depends
-from typing import Dict, List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from functools import wraps
+from typing import Dict, List, Optional
+import hashlib
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload, joinedload
-from datetime import datetime, timedelta
 
-from ..models.database import AsyncSessionLocal
-from ..models import User, Event, Bet
+from ..models.database import ReadOnlyAsyncSessionLocal, refresh_dashboard_stats
+from ..models import User, Event, Bet, DashboardStats
 from ..services.betting_service import betting_service
+from ..utils.cache import admin_cache
 
 router = APIRouter(prefix="/admin")
 
+# Page size bounds for the admin listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    # Admin endpoints only read, so use the read-only session factory
+    async with ReadOnlyAsyncSessionLocal() as session:
         yield session
 
 
+async def get_dashboard_stats(db: AsyncSession) -> DashboardStats:
+    """Read the materialized dashboard stats row, computing it if it doesn't exist yet"""
+    result = await db.execute(select(DashboardStats))
+    stats = result.scalar_one_or_none()
+    if stats is None:
+        await refresh_dashboard_stats()
+        result = await db.execute(select(DashboardStats))
+        stats = result.scalar_one()
+    return stats
+
+
+def paginate(stmt, id_column, limit: int, cursor: Optional[int]):
+    """Apply keyset pagination: rows with id greater than the cursor, ordered by id"""
+    if cursor is not None:
+        stmt = stmt.where(id_column > cursor)
+    return stmt.order_by(id_column).limit(limit)
+
+
+def next_cursor(items: List[Dict], limit: int) -> Optional[int]:
+    """Cursor for the next page, or None when this page is the last one"""
+    return items[-1]["id"] if len(items) == limit else None
+
+
+def cached_response(endpoint):
+    """Serve an endpoint from admin_cache with an ETag, answering If-None-Match with 304"""
+    # The wrapped endpoint must declare a `request: Request` parameter
+    @wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs["request"]
+        key = str(request.url)  # Path plus query string, so each page is cached separately
+        entry = admin_cache.get(key)
+        if entry is None:
+            body = await endpoint(*args, **kwargs)
+            content = json.dumps(jsonable_encoder(body), sort_keys=True).encode()
+            entry = admin_cache.set(key, (content, f'"{hashlib.md5(content).hexdigest()}"'))
+        content, etag = entry
+        
+        headers = {"ETag": etag, "Cache-Control": f"max-age={admin_cache.ttl}"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=content, media_type="application/json", headers=headers)
+    
+    return wrapper
+
+
 @router.get("/dashboard")
-async def get_admin_dashboard(db: AsyncSession = Depends(get_db)):
+@cached_response
+async def get_admin_dashboard(request: Request, db: AsyncSession = Depends(get_db)):
     """Main admin dashboard with comprehensive analytics"""
-    # Get basic stats
-    user_count_result = await db.execute(sqlalchemy.select(func.count(User.id)))
-    user_count = user_count_result.scalar()
-    
-    event_count_result = await db.execute(sqlalchemy.select(func.count(Event.id)))
-    event_count = event_count_result.scalar()
-    
-    bet_count_result = await db.execute(sqlalchemy.select(func.count(Bet.id)))
-    bet_count = bet_count_result.scalar()
+    # Basic and financial stats come from the periodically refreshed summary row
+    stats = await get_dashboard_stats(db)
     
-    # Get financial stats
-    total_balances_result = await db.execute(sqlalchemy.select(func.sum(User.balance)))
-    total_balances = total_balances_result.scalar() or 0.0
-    
-    total_deposited_result = await db.execute(sqlalchemy.select(func.sum(User.total_deposited)))
-    total_deposited = total_deposited_result.scalar() or 0.0
-    
-    # Get service analytics
-    service_analytics = betting_service.get_admin_analytics()
+    # Get service analytics (counters from the same summary row, so the response is consistent)
+    service_analytics = await betting_service.get_admin_analytics(db, stats)
     
     return {
         "basic_stats": {
-            "total_users": user_count,
-            "total_events": event_count,
-            "total_bets": bet_count,
+            "total_users": stats.total_users,
+            "total_events": stats.total_events,
+            "total_bets": stats.total_bets,
         },
         "financial_stats": {
-            "total_user_balances": total_balances,
-            "total_deposited_by_users": total_deposited,
+            "total_user_balances": stats.total_balances,
+            "total_deposited_by_users": stats.total_deposited,
         },
-        "service_analytics": service_analytics
+        "service_analytics": service_analytics,
+        "stats_updated_at": stats.updated_at
     }
 
 
 @router.get("/users")
-async def get_all_users(db: AsyncSession = Depends(get_db)):
-    """Get all users with their balances and deposit history"""
-    result = await db.execute(select(User))
-    users = result.scalars().all()
+@cached_response
+async def get_all_users(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of users with their balances and deposit history"""
+    stmt = select(
+        User.id,
+        User.username,
+        User.email,
+        User.role,
+        User.balance,
+        User.total_deposited,
+        User.is_active,
+        User.created_at
+    )
+    result = await db.execute(paginate(stmt, User.id, limit, cursor))
     
-    user_list = []
-    for user in users:
-        user_list.append({
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role,
-            "balance": user.balance,
-            "total_deposited": user.total_deposited,
-            "is_active": user.is_active,
-            "created_at": user.created_at
-        })
+    user_list = [dict(row._mapping) for row in result.all()]
     
-    return {"users": user_list}
+    return {"users": user_list, "next_cursor": next_cursor(user_list, limit)}
 
 
 @router.get("/events")
-async def get_all_events(db: AsyncSession = Depends(get_db)):
-    """Get all events with detailed statistics"""
-    result = await db.execute(
-        select(Event)
-        .options(selectinload(Event.bets))
+@cached_response
+async def get_all_events(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of events with detailed statistics"""
+    # Aggregate bet counts and stakes in SQL instead of loading every bet
+    stmt = (
+        select(
+            Event.id,
+            Event.name,
+            Event.sport_type,
+            Event.is_active,
+            Event.is_finished,
+            Event.result,
+            Event.start_time,
+            func.count(Bet.id).label("total_bets"),
+            func.coalesce(func.sum(Bet.amount), 0.0).label("total_staked"),
+            Event.created_at
+        )
+        .outerjoin(Bet, Bet.event_id == Event.id)
+        .group_by(Event.id)
+    )
+    result = await db.stream(
+        paginate(stmt, Event.id, limit, cursor).execution_options(yield_per=500)
     )
-    events = result.scalars().all()
     
-    event_list = []
-    for event in events:
-        # Calculate stats for this event
-        total_bets = len(event.bets)
-        total_staked = sum(bet.amount for bet in event.bets)
-        
-        event_list.append({
-            "id": event.id,
-            "name": event.name,
-            "sport_type": event.sport_type,
-            "is_active": event.is_active,
-            "is_finished": event.is_finished,
-            "result": event.result,
-            "start_time": event.start_time,
-            "total_bets": total_bets,
-            "total_staked": total_staked,
-            "created_at": event.created_at
-        })
+    event_list = [dict(row._mapping) async for row in result]
     
-    return {"events": event_list}
+    return {"events": event_list, "next_cursor": next_cursor(event_list, limit)}
 
 
 @router.get("/bets")
-async def get_all_bets(db: AsyncSession = Depends(get_db)):
-    """Get all bets with details"""
-    result = await db.execute(
-        select(Bet)
-        .options(joinedload(Bet.user), joinedload(Bet.event))
+@cached_response
+async def get_all_bets(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of bets with details"""
+    # Project only the needed columns instead of hydrating full User/Event objects
+    stmt = (
+        select(
+            Bet.id,
+            Bet.user_id,
+            func.coalesce(User.username, "Unknown").label("username"),
+            Bet.event_id,
+            func.coalesce(Event.name, "Unknown").label("event_name"),
+            Bet.amount,
+            Bet.odds,
+            Bet.predicted_outcome,
+            Bet.is_won,
+            Bet.payout,
+            Bet.placed_at,
+            Bet.resolved_at
+        )
+        .outerjoin(User, Bet.user_id == User.id)
+        .outerjoin(Event, Bet.event_id == Event.id)
+    )
+    result = await db.stream(
+        paginate(stmt, Bet.id, limit, cursor).execution_options(yield_per=500)
     )
-    bets = result.scalars().all()
     
-    bet_list = []
-    for bet in bets:
-        bet_list.append({
-            "id": bet.id,
-            "user_id": bet.user_id,
-            "username": bet.user.username if bet.user else "Unknown",
-            "event_id": bet.event_id,
-            "event_name": bet.event.name if bet.event else "Unknown",
-            "amount": bet.amount,
-            "odds": bet.odds,
-            "predicted_outcome": bet.predicted_outcome,
-            "is_won": bet.is_won,
-            "payout": bet.payout,
-            "placed_at": bet.placed_at,
-            "resolved_at": bet.resolved_at
-        })
+    bet_list = [dict(row._mapping) async for row in result]
     
-    return {"bets": bet_list}
+    return {"bets": bet_list, "next_cursor": next_cursor(bet_list, limit)}
 
 
 @router.get("/analytics")
-async def get_detailed_analytics(db: AsyncSession = Depends(get_db)):
+@cached_response
+async def get_detailed_analytics(request: Request, db: AsyncSession = Depends(get_db)):
     """Get detailed analytics for the admin dashboard"""
-    # Service-level analytics
-    service_analytics = betting_service.get_admin_analytics()
+    # DB-based analytics from the periodically refreshed summary row
+    stats = await get_dashboard_stats(db)
     
-    # Additional DB-based analytics
-    # Active users in the last 24 hours
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    active_users_result = await db.execute(
-        select(func.count(User.id)).where(User.updated_at >= yesterday)
-    )
-    active_users_last_24h = active_users_result.scalar()
-    
-    # Bets in the last 24 hours
-    recent_bets_result = await db.execute(
-        select(func.count(Bet.id)).where(Bet.placed_at >= yesterday)
-    )
-    bets_last_24h = recent_bets_result.scalar()
+    # Service-level analytics (counters from the same summary row, so the response is consistent)
+    service_analytics = await betting_service.get_admin_analytics(db, stats)
     
     # Revenue calculation (approximate)
-    total_deposited_result = await db.execute(select(func.sum(User.total_deposited)))
-    total_deposited = total_deposited_result.scalar() or 0.0
-    
-    total_payouts_result = await db.execute(select(func.sum(Bet.payout)))
-    total_payouts = total_payouts_result.scalar() or 0.0
-    
-    approximate_revenue = total_deposited - total_payouts
+    approximate_revenue = stats.total_deposited - stats.total_payouts
     
     return {
         "service_analytics": service_analytics,
         "activity_analytics": {
-            "active_users_last_24h": active_users_last_24h,
-            "bets_last_24h": bets_last_24h,
+            "active_users_last_24h": stats.active_users_last_24h,
+            "bets_last_24h": stats.bets_last_24h,
         },
         "financial_analytics": {
-            "total_deposited": total_deposited,
-            "total_payouts": total_payouts,
+            "total_deposited": stats.total_deposited,
+            "total_payouts": stats.total_payouts,
             "approximate_revenue": approximate_revenue
-        }
+        },
+        "stats_updated_at": stats.updated_at
     }
\ No newline at end of file
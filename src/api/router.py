@@ -7,6 +7,7 @@ from ..models import User
 from ..models.database import AsyncSessionLocal
 from ..services.auth_service import AuthService
 from ..services.betting_service import betting_service
+from ..user.profile import ensure_unlocked
 
 router = APIRouter()
 security = HTTPBearer()
@@ -40,18 +41,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 @router.post("/register")
 async def register(username: str, email: str, password: str, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = await auth_service.authenticate_user(db, username, password)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
+    # Insert unless the username or email already exists
+    user_id = await auth_service.register_user(db, username, email, password)
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Username or email already registered")
     
-    # Create new user
-    user = auth_service.create_user(username, email, password)
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    
-    return {"message": "User created successfully", "user_id": user.id}
+    return {"message": "User created successfully", "user_id": user_id}
 
 
 @router.post("/login")
@@ -109,6 +104,9 @@ async def withdraw_money(amount: float, current_user: dict = Depends(get_current
     # For demo purposes, using a mock user_id
     user_id = 1  # This should come from the token
     
+    # Reject locked users before any DB work
+    ensure_unlocked(user_id)
+    
     try:
         result = await betting_service.withdraw_money(user_id, amount)
         return result
@@ -140,6 +138,9 @@ async def place_bet(event_id: int, amount: float, outcome: str, current_user: di
     # We would need user_id in the token to implement this properly
     user_id = 1  # This should come from the token
     
+    # Reject locked users before any DB work
+    ensure_unlocked(user_id)
+    
     try:
         # In a real implementation, we would pass the actual user_id
         bet = await betting_service.place_bet(db, user_id, event_id, amount, outcome)
@@ -150,12 +151,12 @@ async def place_bet(event_id: int, amount: float, outcome: str, current_user: di
 
 # Admin endpoints
 @router.get("/admin/analytics")
-async def get_admin_analytics(current_user: dict = Depends(get_current_user)):
+async def get_admin_analytics(current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get admin analytics dashboard"""
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    analytics = betting_service.get_admin_analytics()
+    analytics = await betting_service.get_admin_analytics(db)
     return analytics
 
 
@@ -1,4 +1,5 @@
-from .database import init_db, close_db
+from .database import init_db, close_db, refresh_dashboard_stats
 from .user import User
 from .bet import Bet
-from .event import Event
\ No newline at end of file
+from .event import Event
+from .dashboard_stats import DashboardStats
\ No newline at end of file
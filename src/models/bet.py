@@ -1,21 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, Float, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from .database import Base
+from .database import Base, OUTCOME_TYPE
 from datetime import datetime
 
 class Bet(Base):
     __tablename__ = "bets"
+    __table_args__ = (
+        Index("ix_bets_placed_is_won", "placed_at", "is_won"),  # Recent (unresolved) bets lookups
+        # Covers the per-outcome odds aggregate (SUM(amount) GROUP BY outcome for one event)
+        Index("ix_bets_event_outcome_amount", "event_id", "predicted_outcome", "amount"),
+    )
+    # Fetch server defaults (placed_at) with RETURNING on INSERT instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     amount = Column(Float, nullable=False)  # Amount of the bet
     odds = Column(Float, nullable=False)  # Odds at the time of bet placement
-    predicted_outcome = Column(String, nullable=False)  # What the user bet on (e.g. "team_a_won")
+    predicted_outcome = Column(OUTCOME_TYPE, nullable=False)  # What the user bet on (e.g. "team_a_won")
     is_won = Column(Boolean, default=None)  # None = pending, True = won, False = lost
     payout = Column(Float, default=0.0)  # Amount paid out if won
-    placed_at = Column(DateTime(timezone=True), server_default=func.now())
+    placed_at = Column(DateTime(timezone=True), server_default=func.now())  # Indexed via ix_bets_placed_is_won
     resolved_at = Column(DateTime(timezone=True), nullable=True)  # When the bet was resolved
     
     # Relationships
@@ -24,11 +31,3 @@ class Bet(Base):
 
     def __repr__(self):
         return f"<Bet(id={self.id}, user_id={self.user_id}, event_id={self.event_id}, amount={self.amount}, is_won={self.is_won})>"
-
-
-# Add relationships to other models
-from .user import User
-from .event import Event
-
-User.bets = relationship("Bet", back_populates="user")
-Event.bets = relationship("Bet", back_populates="event")
\ No newline at end of file
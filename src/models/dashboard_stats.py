@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Float
+from sqlalchemy.sql import func
+from .database import Base
+from datetime import datetime
+
+class DashboardStats(Base):
+    __tablename__ = "dashboard_stats"
+
+    id = Column(Integer, primary_key=True)  # Single-row table, always id=1
+    total_users = Column(Integer, default=0)
+    total_events = Column(Integer, default=0)
+    active_events = Column(Integer, default=0)  # Events still open for betting
+    total_bets = Column(Integer, default=0)
+    total_balances = Column(Float, default=0.0)  # Sum of all user balances
+    total_deposited = Column(Float, default=0.0)  # Sum of all user deposits
+    total_payouts = Column(Float, default=0.0)  # Sum of all bet payouts
+    active_users_last_24h = Column(Integer, default=0)
+    bets_last_24h = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())  # When the stats were last refreshed
+
+    def __repr__(self):
+        return f"<DashboardStats(total_users={self.total_users}, total_events={self.total_events}, total_bets={self.total_bets}, updated_at={self.updated_at})>"
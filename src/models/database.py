@@ -1,31 +1,128 @@
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey
+import logging
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, MetaData, Enum, select, func, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime
+from ..utils.helpers import SportType, Outcome
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = "sqlite+aiosqlite:///./betting_platform.db"
 
 engine = create_async_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool
+    connect_args={"timeout": 30},  # Seconds to wait on a locked database
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=20,
+    max_overflow=10,  # Kept small: SQLite allows one writer and each connection has a 64 MiB cache
+    pool_pre_ping=False,  # Local SQLite file, a dropped connection isn't a concern
+    pool_recycle=3600,
+    pool_timeout=30,
+    query_cache_size=1200  # Compiled statement cache entries
 )
 
-AsyncSessionLocal = sessionmaker(
-    autocommit=False,
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Per-connection settings; journal_mode=WAL is persistent and set once in init_db
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB memory-mapped I/O
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# One shared factory over the pooled engine; instances stay loaded after commit
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
     autoflush=False,
-    bind=engine,
-    class_=AsyncSession
+    expire_on_commit=False
 )
 
-Base = declarative_base()
+# Read-only endpoints need the same settings (no autoflush, no expire on commit)
+ReadOnlyAsyncSessionLocal = AsyncSessionLocal
+
+# Enum CHECK constraints are named per table (ck_bets_outcome, ck_events_outcome)
+Base = declarative_base(metadata=MetaData(naming_convention={"ck": "ck_%(table_name)s_%(constraint_name)s"}))
+
+def enum_values(enum_class):
+    """Values of an enum class, for string-valued Enum columns (loaded back as plain str)"""
+    return [member.value for member in enum_class]
+
+# Shared column types for the enum-valued columns
+SPORT_TYPE_TYPE = Enum(*enum_values(SportType), name="sport_type", native_enum=False, length=12, create_constraint=True)
+OUTCOME_TYPE = Enum(*enum_values(Outcome), name="outcome", native_enum=False, length=12, create_constraint=True)
 
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # WAL lets readers run concurrently with a writer and needs one fsync per commit.
+    # SQLite can't switch journal mode inside a transaction, so run it in autocommit.
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
 
 async def close_db():
-    await engine.dispose()
\ No newline at end of file
+    await engine.dispose()
+
+async def refresh_dashboard_stats():
+    """Recompute the aggregates and upsert them into the single dashboard_stats row"""
+    # Imported here to avoid a circular import (the models import Base from this module)
+    from .user import User
+    from .event import Event
+    from .bet import Bet
+    from .dashboard_stats import DashboardStats
+
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            # Evaluated by SQLite so the statement has no per-call bind value
+            yesterday = func.datetime("now", "-1 day")
+
+            # All aggregates in a single round-trip via scalar subqueries
+            result = await session.execute(
+                select(
+                    select(func.count(User.id)).scalar_subquery().label("total_users"),
+                    select(func.count(Event.id)).scalar_subquery().label("total_events"),
+                    select(func.count(Event.id)).where(Event.is_active == True)
+                    .scalar_subquery().label("active_events"),
+                    select(func.count(Bet.id)).scalar_subquery().label("total_bets"),
+                    select(func.sum(User.balance)).scalar_subquery().label("total_balances"),
+                    select(func.sum(User.total_deposited)).scalar_subquery().label("total_deposited"),
+                    select(func.sum(Bet.payout)).scalar_subquery().label("total_payouts"),
+                    select(func.count(User.id)).where(User.updated_at >= yesterday)
+                    .scalar_subquery().label("active_users_last_24h"),
+                    select(func.count(Bet.id)).where(Bet.placed_at >= yesterday)
+                    .scalar_subquery().label("bets_last_24h")
+                )
+            )
+            row = result.one()
+
+            values = {
+                "total_users": row.total_users,
+                "total_events": row.total_events,
+                "active_events": row.active_events,
+                "total_bets": row.total_bets,
+                "total_balances": row.total_balances or 0.0,
+                "total_deposited": row.total_deposited or 0.0,
+                "total_payouts": row.total_payouts or 0.0,
+                "active_users_last_24h": row.active_users_last_24h,
+                "bets_last_24h": row.bets_last_24h,
+                "updated_at": datetime.utcnow(),
+            }
+            stmt = sqlite_insert(DashboardStats).values(id=1, **values)
+            await session.execute(
+                stmt.on_conflict_do_update(index_elements=[DashboardStats.id], set_=values)
+            )
+
+async def run_dashboard_stats_refresher(interval: int):
+    """Periodically refresh dashboard_stats (SQLite has no materialized views)"""
+    while True:
+        try:
+            await refresh_dashboard_stats()
+        except Exception:
+            # Keep serving the last snapshot and retry on the next tick
+            logger.exception("Failed to refresh dashboard stats")
+        await asyncio.sleep(interval)
\ No newline at end of file
@@ -1,21 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Text, Index
 from sqlalchemy.sql import func
-from .database import Base
+from sqlalchemy.orm import relationship
+from .database import Base, SPORT_TYPE_TYPE, OUTCOME_TYPE
 from datetime import datetime
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_sport_active", "sport_type", "is_active"),  # Filter-by-sport listings
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)  # Name of the event (e.g. "Football Match: Team A vs Team B")
-    sport_type = Column(String, nullable=False)  # Sport discipline (e.g. "football", "basketball", "tennis")
+    sport_type = Column(SPORT_TYPE_TYPE, nullable=False)  # Sport discipline (e.g. "football", "basketball", "tennis")
     description = Column(Text)
     start_time = Column(DateTime, nullable=False)  # When the event starts
     is_active = Column(Boolean, default=True)  # Whether betting is still allowed
     is_finished = Column(Boolean, default=False)  # Whether the event has finished
-    result = Column(String)  # Result of the event (e.g. "team_a_won", "team_b_won", "draw")
+    result = Column(OUTCOME_TYPE)  # Result of the event (e.g. "team_a_won", "team_b_won", "draw")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Relationships (lazy="raise": load explicitly or aggregate in SQL)
+    bets = relationship("Bet", back_populates="event", lazy="raise")
+
     def __repr__(self):
         return f"<Event(id={self.id}, name='{self.name}', sport_type='{self.sport_type}', is_active={self.is_active})>"
\ No newline at end of file
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
 
@@ -15,7 +16,10 @@ class User(Base):
     total_deposited = Column(Float, default=0.0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+
+    # Relationships (lazy="raise": load explicitly or aggregate in SQL)
+    bets = relationship("Bet", back_populates="user", lazy="raise")
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', role='{self.role}', balance={self.balance})>"
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .betting_service import betting_service
-from .auth_service import AuthService
\ No newline at end of file
+from .auth_service import AuthService
+from .lock_table import LockTable
\ No newline at end of file
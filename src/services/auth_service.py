@@ -1,21 +1,41 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from functools import lru_cache
+import asyncio
 import secrets
 import hashlib
+import time
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+import jwt
 
+from config import SECRET_KEY, ALGORITHM
 from ..models.user import User
+from ..utils.cache import admin_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (10 rounds keeps logins fast while staying within OWASP guidance)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=10)
 
-# Secret key for JWT tokens (in production, this should be stored securely)
-SECRET_KEY = "your-secret-key-here-change-in-production"
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verified against on unknown usernames so a miss costs the same as a wrong password
+_DUMMY_HASH = pwd_context.hash("dummy-password")
+
+# Built once so every login reuses the same cached compiled statement
+_AUTH_STMT = select(User).where(User.username == bindparam("username"))
+
+# Decoded tokens are cached per time bucket so entries self-invalidate
+TOKEN_CACHE_BUCKET_SECONDS = 30
+
+
+@lru_cache(maxsize=4096)
+def _decode_token(token: str, bucket: int) -> Optional[dict]:
+    """Decode and verify a JWT, returning None if it is invalid (cached per bucket)"""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
 
 
 class AuthService:
@@ -43,23 +63,28 @@ class AuthService:
 
     async def authenticate_user(self, session: AsyncSession, username: str, password: str) -> Optional[User]:
         """Authenticate a user by username and password"""
-        result = await session.execute(select(User).filter(User.username == username))
+        result = await session.execute(_AUTH_STMT, {"username": username})
         user = result.scalar_one_or_none()
-        if not user or not self.verify_password(password, user.hashed_password):
+        # Always run bcrypt (off the event loop) so response time doesn't reveal valid usernames
+        hashed_password = user.hashed_password if user else _DUMMY_HASH
+        password_ok = await asyncio.to_thread(self.verify_password, password, hashed_password)
+        if user is None or not password_ok:
             return None
         return user
 
     def get_current_user_role(self, token: str) -> Optional[str]:
         """Extract user role from token"""
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username: str = payload.get("sub")
-            user_role: str = payload.get("role")
-            if username is None or user_role is None:
-                return None
-            return user_role
-        except JWTError:
+        now = time.time()
+        payload = _decode_token(token, int(now) // TOKEN_CACHE_BUCKET_SECONDS)
+        if payload is None:
+            return None
+        # A cached payload may outlive the token's expiry within its bucket
+        expire = payload.get("exp")
+        if expire is not None and expire <= now:
             return None
+        if payload.get("sub") is None:
+            return None
+        return payload.get("role")
 
     def create_user(self, username: str, email: str, password: str, role: str = "user") -> User:
         """Create a new user object with hashed password"""
@@ -71,4 +96,27 @@ class AuthService:
             role=role,
             balance=100.0  # Start with $100 balance for new users
         )
-        return user
\ No newline at end of file
+        return user
+
+    async def register_user(self, session: AsyncSession, username: str, email: str, password: str, role: str = "user") -> Optional[int]:
+        """Insert a new user in one round-trip, returning its id or None if the username/email is taken"""
+        # Hash outside the transaction and off the event loop
+        hashed_password = await asyncio.to_thread(self.get_password_hash, password)
+        stmt = (
+            sqlite_insert(User)
+            .values(
+                username=username,
+                email=email,
+                hashed_password=hashed_password,
+                role=role,
+                balance=100.0  # Start with $100 balance for new users
+            )
+            .on_conflict_do_nothing()
+            .returning(User.id)
+        )
+        result = await session.execute(stmt)
+        user_id = result.scalar()
+        await session.commit()
+        if user_id is not None:
+            admin_cache.clear()  # Admin listings and stats are now stale
+        return user_id
\ No newline at end of file
@@ -4,17 +4,33 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import insert, update, bindparam, func
 
-from ..models import User, Event, Bet
+from config import BOOKIE_MARGIN, WITHDRAWAL_LOCK_DURATION
+from ..models import User, Event, Bet, DashboardStats
 from ..models.database import AsyncSessionLocal
+from ..utils.cache import admin_cache
+from .lock_table import LockTable
+
+
+_SPORT_TYPES = ("football", "basketball", "tennis", "hockey", "volleyball")
+_SPORT_TITLES = {sport: sport.title() for sport in _SPORT_TYPES}
+_DEFAULT_ODDS = {"team_a_won": 2.0, "team_b_won": 2.0, "draw": 3.0}  # Odds for standard outcomes with no bets
+_TEAMS = (
+    "Team A", "Team B", "Team C", "Team D", "Team E", "Team F",
+    "Lions", "Tigers", "Bears", "Eagles", "Wolves", "Sharks",
+    "Dragons", "Phoenix", "Hawks", "Falcons", "Ravens", "Owls"
+)
 
 
 class BettingService:
     def __init__(self):
-        self.locked_users = {}  # Dictionary to track locked users and their unlock times
+        self.locked_users = LockTable()  # Locked users and their unlock deadlines
         self.total_service_deposit = 0.0  # Total money in the system
-        self.bookie_margin = 0.05  # 5% bookie margin
+        self.bookie_margin = BOOKIE_MARGIN  # 5% bookie margin by default
+        self._event_totals: Dict[int, Dict[str, float]] = {}  # event_id -> {outcome: total amount bet}
+        self._event_totals_locks: Dict[int, asyncio.Lock] = {}  # event_id -> lock for loading its totals
+        self._event_totals_versions: Dict[int, int] = {}  # event_id -> bets committed while not cached
 
     async def get_session(self) -> AsyncSession:
         """Get a database session"""
@@ -23,129 +39,141 @@ class BettingService:
 
     async def create_random_events(self, session: AsyncSession, count: int = 10):
         """Create random events for betting"""
-        sports_types = ["football", "basketball", "tennis", "hockey", "volleyball"]
-        teams = [
-            "Team A", "Team B", "Team C", "Team D", "Team E", "Team F", 
-            "Lions", "Tigers", "Bears", "Eagles", "Wolves", "Sharks",
-            "Dragons", "Phoenix", "Hawks", "Falcons", "Ravens", "Owls"
-        ]
-        
+        now = datetime.utcnow()
+        rows = []
         for i in range(count):
-            sport = random.choice(sports_types)
-            team1 = random.choice(teams)
-            team2 = random.choice([t for t in teams if t != team1])
+            sport = random.choice(_SPORT_TYPES)
+            # Two distinct teams in one call
+            team1, team2 = random.sample(_TEAMS, 2)
             
-            event = Event(
-                name=f"{sport.title()} Match: {team1} vs {team2}",
-                sport_type=sport,
-                description=f"Upcoming {sport} match between {team1} and {team2}",
-                start_time=datetime.utcnow() + timedelta(hours=random.randint(1, 24)),
-                is_active=True,
-                is_finished=False
-            )
-            session.add(event)
+            rows.append({
+                "name": f"{_SPORT_TITLES[sport]} Match: {team1} vs {team2}",
+                "sport_type": sport,
+                "description": f"Upcoming {sport} match between {team1} and {team2}",
+                "start_time": now + timedelta(hours=random.randint(1, 24)),
+                "is_active": True,
+                "is_finished": False
+            })
         
+        # One bulk INSERT instead of per-object unit-of-work bookkeeping
+        await session.execute(insert(Event), rows)
         await session.commit()
+        admin_cache.clear()  # Admin listings and stats are now stale
+
+    async def _get_event_totals(self, session: AsyncSession, event_id: int) -> Dict[str, float]:
+        """Total amount bet per outcome for an event, cached and kept up to date by place_bet"""
+        totals = self._event_totals.get(event_id)
+        if totals is not None:
+            return totals
+        
+        # Single-flight: concurrent callers for the same event wait for one load
+        lock = self._event_totals_locks.setdefault(event_id, asyncio.Lock())
+        async with lock:
+            totals = self._event_totals.get(event_id)
+            if totals is None:
+                version = self._event_totals_versions.get(event_id, 0)
+                # Sum bet amounts per outcome in SQL
+                result = await session.execute(
+                    select(Bet.predicted_outcome, func.sum(Bet.amount))
+                    .where(Bet.event_id == event_id)
+                    .group_by(Bet.predicted_outcome)
+                )
+                totals = {outcome: amount for outcome, amount in result.all()}
+                # A bet committed while the SELECT was in flight may be missing from it, so only
+                # cache the result if none was; otherwise the next call loads again
+                if self._event_totals_versions.get(event_id, 0) == version:
+                    totals = self._event_totals.setdefault(event_id, totals)
+        return totals
+
+    def _odd_from_totals(self, totals: Dict[str, float], total_amount: float, outcome: str) -> float:
+        """Inverse proportion odd for an outcome that has bets (more bets = lower odds)"""
+        bet_amount = totals[outcome]
+        if bet_amount > 0:
+            # Higher odds for outcomes with less money bet on them
+            base_odd = total_amount / bet_amount
+            # Apply bookie margin
+            adjusted_odd = base_odd * (1 - self.bookie_margin)
+            # Ensure minimum odd value
+            return max(adjusted_odd, 1.1)
+        # Default odds for outcomes with no bets yet
+        return 2.0
 
     async def calculate_odds_based_on_bets(self, session: AsyncSession, event_id: int):
         """Calculate dynamic odds based on the amount of bets placed on each outcome"""
-        # Get all bets for this event
-        result = await session.execute(
-            select(Bet).where(Bet.event_id == event_id)
-        )
-        bets = result.scalars().all()
-        
-        if not bets:
-            # Default odds if no bets yet
-            return {"team_a_won": 2.0, "team_b_won": 2.0, "draw": 3.0}
-        
-        # Count bets and amounts for each outcome
-        outcome_stats = {}
-        for bet in bets:
-            outcome = bet.predicted_outcome
-            if outcome not in outcome_stats:
-                outcome_stats[outcome] = {"count": 0, "amount": 0.0}
-            outcome_stats[outcome]["count"] += 1
-            outcome_stats[outcome]["amount"] += bet.amount
-        
-        # Calculate inverse proportion odds (more bets = lower odds)
-        total_amount = sum(outcome_stats[outcome]["amount"] for outcome in outcome_stats)
-        
-        odds = {}
-        for outcome in outcome_stats:
-            bet_amount = outcome_stats[outcome]["amount"]
-            if bet_amount > 0:
-                # Higher odds for outcomes with less money bet on them
-                base_odd = total_amount / bet_amount
-                # Apply bookie margin
-                adjusted_odd = base_odd * (1 - self.bookie_margin)
-                # Ensure minimum odd value
-                odds[outcome] = max(adjusted_odd, 1.1)
-            else:
-                # Default odds for outcomes with no bets yet
-                odds[outcome] = 2.0
+        totals = await self._get_event_totals(session, event_id)
+        total_amount = sum(totals.values())
+        
+        odds = {outcome: self._odd_from_totals(totals, total_amount, outcome) for outcome in totals}
         
         # Ensure we have odds for standard outcomes even if no bets yet
-        if "team_a_won" not in odds:
-            odds["team_a_won"] = 2.0
-        if "team_b_won" not in odds:
-            odds["team_b_won"] = 2.0
-        if "draw" not in odds:
-            odds["draw"] = 3.0
+        for outcome, default_odd in _DEFAULT_ODDS.items():
+            odds.setdefault(outcome, default_odd)
             
         return odds
 
+    async def get_odd_for_outcome(self, session: AsyncSession, event_id: int, outcome: str) -> Optional[float]:
+        """Current odd for a single outcome, or None if the outcome is not valid for the event"""
+        totals = await self._get_event_totals(session, event_id)
+        if outcome in totals:
+            return self._odd_from_totals(totals, sum(totals.values()), outcome)
+        return _DEFAULT_ODDS.get(outcome)
+
     async def place_bet(self, session: AsyncSession, user_id: int, event_id: int, amount: float, predicted_outcome: str):
         """Place a bet for a user on an event"""
         # Check if user is locked
-        if user_id in self.locked_users:
-            unlock_time = self.locked_users[user_id]
-            if datetime.utcnow() < unlock_time:
-                raise Exception("User is temporarily locked due to withdrawal action")
-            else:
-                # Remove user from locked list if lock expired
-                del self.locked_users[user_id]
-        
-        # Get user
-        result = await session.execute(select(User).filter(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if not user:
-            raise Exception("User not found")
-        
-        # Check if user has enough balance
-        if user.balance < amount:
-            raise Exception("Insufficient balance")
+        if self.locked_users.is_locked(user_id):
+            raise Exception("User is temporarily locked due to withdrawal action")
         
         # Get event
-        result = await session.execute(select(Event).filter(Event.id == event_id))
-        event = result.scalar_one_or_none()
+        event = await session.get(Event, event_id)
         if not event or not event.is_active or event.is_finished:
             raise Exception("Event is not active for betting")
         
         # Calculate current odds for this outcome
-        current_odds = await self.calculate_odds_based_on_bets(session, event_id)
-        if predicted_outcome not in current_odds:
+        odds = await self.get_odd_for_outcome(session, event_id, predicted_outcome)
+        if odds is None:
             raise Exception(f"Invalid outcome: {predicted_outcome}")
         
+        # Deduct amount from user balance atomically, only if the balance covers it
+        result = await session.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= amount)
+            .values(
+                balance=User.balance - amount,
+                total_deposited=User.total_deposited + amount  # Track total deposited for analytics
+            )
+            .returning(User.balance)
+            .execution_options(synchronize_session=False)
+        )
+        if result.first() is None:
+            # Only the failure path pays for a lookup to report which check failed
+            if await session.get(User, user_id) is None:
+                raise Exception("User not found")
+            raise Exception("Insufficient balance")
+        
         # Create the bet
         bet = Bet(
             user_id=user_id,
             event_id=event_id,
             amount=amount,
-            odds=current_odds[predicted_outcome],
+            odds=odds,
             predicted_outcome=predicted_outcome
         )
         
-        # Deduct amount from user balance
-        user.balance -= amount
-        user.total_deposited += amount  # Track total deposited for analytics
-        
         # Update service deposit (track money in system)
         self.total_service_deposit += amount
         
         session.add(bet)
         await session.commit()
-        await session.refresh(bet)
+        admin_cache.clear()  # Admin listings and stats are now stale
+        
+        # Keep the cached per-outcome totals in step with the new bet
+        totals = self._event_totals.get(event_id)
+        if totals is not None:
+            totals[predicted_outcome] = totals.get(predicted_outcome, 0.0) + amount
+        else:
+            # Not cached yet: make any in-flight load discard its possibly stale result
+            self._event_totals_versions[event_id] = self._event_totals_versions.get(event_id, 0) + 1
         
         return bet
 
@@ -162,72 +190,105 @@ class BettingService:
         event.is_finished = True
         event.result = actual_result
         
-        # Get all bets for this event
+        resolved_at = datetime.utcnow()
+        is_winning = (Bet.event_id == event_id) & (Bet.predicted_outcome == actual_result)
+        is_losing = (Bet.event_id == event_id) & (Bet.predicted_outcome != actual_result)
+        
+        # Settle winning bets first and credit exactly the rows this UPDATE touched
         result = await session.execute(
-            select(Bet).options(selectinload(Bet.user)).filter(Bet.event_id == event_id)
+            update(Bet)
+            .where(is_winning)
+            .values(is_won=True, payout=Bet.amount * Bet.odds, resolved_at=resolved_at)
+            .returning(Bet.user_id, Bet.payout)
+            .execution_options(synchronize_session=False)
+        )
+        won_by_user: Dict[int, float] = {}
+        for user_id, payout in result.all():
+            won_by_user[user_id] = won_by_user.get(user_id, 0.0) + payout
+        
+        # Add winnings to user balances in one executemany
+        if won_by_user:
+            users = User.__table__
+            await session.execute(
+                update(users)
+                .where(users.c.id == bindparam("uid"))
+                .values(balance=users.c.balance + bindparam("delta")),
+                [{"uid": user_id, "delta": payout} for user_id, payout in won_by_user.items()]
+            )
+            self.total_service_deposit -= sum(won_by_user.values())  # Update service deposit
+        
+        # Settle losing bets with one UPDATE
+        await session.execute(
+            update(Bet)
+            .where(is_losing)
+            .values(is_won=False, payout=0.0, resolved_at=resolved_at)
+            .execution_options(synchronize_session=False)
         )
-        bets = result.scalars().all()
-        
-        # Process each bet
-        for bet in bets:
-            if bet.predicted_outcome == actual_result:
-                # This bet won
-                bet.is_won = True
-                bet.payout = bet.amount * bet.odds
-                
-                # Add winnings to user balance
-                bet.user.balance += bet.payout
-                self.total_service_deposit -= bet.payout  # Update service deposit
-            else:
-                # This bet lost
-                bet.is_won = False
-                bet.payout = 0.0
-            
-            bet.resolved_at = datetime.utcnow()
         
         await session.commit()
+        admin_cache.clear()  # Admin listings and stats are now stale
+        # No more bets on a finished event
+        self._event_totals.pop(event_id, None)
+        self._event_totals_locks.pop(event_id, None)
+        self._event_totals_versions.pop(event_id, None)
 
     async def withdraw_money(self, user_id: int, amount: float):
         """Withdraw money from user account with temporary lock"""
         # Check if user is locked
-        if user_id in self.locked_users:
-            unlock_time = self.locked_users[user_id]
-            if datetime.utcnow() < unlock_time:
-                raise Exception("User is temporarily locked due to withdrawal action")
-            else:
-                # Remove user from locked list if lock expired
-                del self.locked_users[user_id]
+        if self.locked_users.is_locked(user_id):
+            raise Exception("User is temporarily locked due to withdrawal action")
         
         # Simulate withdrawal process
-        # Add user to locked list for 30 seconds
-        self.locked_users[user_id] = datetime.utcnow() + timedelta(seconds=30)
+        # Lock the user for 30 seconds
+        self.locked_users.lock(user_id, WITHDRAWAL_LOCK_DURATION)
         
         # In a real implementation, this would handle actual payment processing
         # For now, we just simulate the lock mechanism
-        return {"status": "withdrawal_initiated", "lock_duration": 30}
+        return {"status": "withdrawal_initiated", "lock_duration": WITHDRAWAL_LOCK_DURATION}
 
     async def get_user_lock_status(self, user_id: int) -> bool:
         """Check if a user is currently locked"""
-        if user_id in self.locked_users:
-            unlock_time = self.locked_users[user_id]
-            if datetime.utcnow() >= unlock_time:
-                # Lock expired, remove user from locked list
-                del self.locked_users[user_id]
-                return False
-            return True
-        return False
-
-    def get_admin_analytics(self) -> Dict:
-        """Get admin analytics data"""
+        return self.is_user_locked(user_id)
+
+    def is_user_locked(self, user_id: int) -> bool:
+        """Synchronous lock check, cheap enough to run before any DB work"""
+        # Expired locks are purged in the background, so this is a pure read
+        return self.locked_users.is_locked(user_id)
+
+    async def get_admin_analytics(self, session: AsyncSession, stats: Optional[DashboardStats] = None) -> Dict:
+        """Get admin analytics data, from the dashboard stats row when one is given"""
+        if stats is not None:
+            active_events_count = stats.active_events
+            total_bets_placed = stats.total_bets
+            total_payouts = stats.total_payouts
+        else:
+            # All counters in a single round-trip via scalar subqueries
+            result = await session.execute(
+                select(
+                    select(func.count(Event.id)).where(Event.is_active == True)
+                    .scalar_subquery().label("active_events_count"),
+                    select(func.count(Bet.id)).scalar_subquery().label("total_bets_placed"),
+                    select(func.coalesce(func.sum(Bet.payout), 0.0)).scalar_subquery().label("total_payouts")
+                )
+            )
+            active_events_count, total_bets_placed, total_payouts = result.one()
+        
         return {
             "bookie_margin": self.bookie_margin,
             "total_service_deposit": self.total_service_deposit,
             "locked_users_count": len(self.locked_users),
-            "active_events_count": 0,  # Would need DB query in real implementation
-            "total_bets_placed": 0,    # Would need DB query in real implementation
-            "total_payouts": 0         # Would need DB query in real implementation
+            "active_events_count": active_events_count,
+            "total_bets_placed": total_bets_placed,
+            "total_payouts": total_payouts
         }
 
+    async def load_total_service_deposit(self, session: AsyncSession):
+        """Restore total_service_deposit from the bets table (staked minus paid out)"""
+        result = await session.execute(
+            select(func.coalesce(func.sum(Bet.amount), 0.0) - func.coalesce(func.sum(Bet.payout), 0.0))
+        )
+        self.total_service_deposit = result.scalar()
+
 
 # Global instance of betting service
 betting_service = BettingService()
\ No newline at end of file
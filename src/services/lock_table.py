@@ -0,0 +1,44 @@
+import asyncio
+import time
+from typing import Dict, List
+
+
+class LockTable:
+    """Per-user lock deadlines (time.monotonic() floats) split across shards"""
+
+    def __init__(self, shard_count: int = 64):
+        # shard_count must be a power of two so a user id maps to a shard with a mask
+        self._mask = shard_count - 1
+        self._shards: List[Dict[int, float]] = [{} for _ in range(shard_count)]
+
+    def _shard(self, user_id: int) -> Dict[int, float]:
+        return self._shards[user_id & self._mask]
+
+    def lock(self, user_id: int, duration: float):
+        """Lock a user for the given number of seconds"""
+        self._shard(user_id)[user_id] = time.monotonic() + duration
+
+    def is_locked(self, user_id: int) -> bool:
+        """Check if a user is currently locked (a dict lookup and one float compare)"""
+        deadline = self._shard(user_id).get(user_id)
+        return deadline is not None and time.monotonic() < deadline
+
+    def _purge_shard(self, index: int):
+        """Remove expired locks from one shard"""
+        shard = self._shards[index]
+        now = time.monotonic()
+        for user_id in [user_id for user_id, deadline in shard.items() if deadline <= now]:
+            del shard[user_id]
+
+    async def run_purger(self, interval: float):
+        """Periodically drop expired locks, yielding to the event loop between shards"""
+        while True:
+            await asyncio.sleep(interval)
+            for index in range(len(self._shards)):
+                self._purge_shard(index)
+                await asyncio.sleep(0)
+
+    def __len__(self) -> int:
+        """Number of currently locked users"""
+        now = time.monotonic()
+        return sum(1 for shard in self._shards for deadline in shard.values() if now < deadline)
\ No newline at end of file
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from ..models.database import AsyncSessionLocal
 from ..models import User, Bet
 from ..services.betting_service import betting_service
+from ..utils.cache import admin_cache
 
 router = APIRouter(prefix="/user")
 
@@ -14,6 +15,18 @@ async def get_db():
         yield session
 
 
+# Raises 423 for a user with an active withdrawal lock (a pure in-memory check)
+def ensure_unlocked(user_id: int) -> None:
+    if betting_service.is_user_locked(user_id):
+        raise HTTPException(status_code=423, detail="Account temporarily locked due to recent withdrawal")
+
+
+# Rejects locked users before the endpoint (and any DB work) runs
+async def require_unlocked_user(user_id: int) -> int:
+    ensure_unlocked(user_id)
+    return user_id
+
+
 @router.get("/profile")
 async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user profile information"""
@@ -40,24 +53,24 @@ async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_db)):
 @router.get("/bets")
 async def get_user_bets(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get all bets placed by a specific user"""
-    result = await db.execute(
-        select(Bet).filter(Bet.user_id == user_id)
+    # Plain columns only, streamed in batches, no ORM objects
+    result = await db.stream(
+        select(
+            Bet.id,
+            Bet.event_id,
+            Bet.amount,
+            Bet.odds,
+            Bet.predicted_outcome,
+            Bet.is_won,
+            Bet.payout,
+            Bet.placed_at,
+            Bet.resolved_at
+        )
+        .where(Bet.user_id == user_id)
+        .execution_options(yield_per=500)
     )
-    bets = result.scalars().all()
     
-    bet_list = []
-    for bet in bets:
-        bet_list.append({
-            "id": bet.id,
-            "event_id": bet.event_id,
-            "amount": bet.amount,
-            "odds": bet.odds,
-            "predicted_outcome": bet.predicted_outcome,
-            "is_won": bet.is_won,
-            "payout": bet.payout,
-            "placed_at": bet.placed_at,
-            "resolved_at": bet.resolved_at
-        })
+    bet_list = [dict(row._mapping) async for row in result]
     
     return {"bets": bet_list}
 
@@ -94,21 +107,17 @@ async def deposit_funds(user_id: int, amount: float, db: AsyncSession = Depends(
     user.total_deposited += amount
     
     await db.commit()
+    admin_cache.clear()  # Admin listings and stats are now stale
     
     return {"message": "Deposit successful", "new_balance": user.balance}
 
 
 @router.post("/withdraw")
-async def withdraw_funds(user_id: int, amount: float):
+async def withdraw_funds(amount: float, user_id: int = Depends(require_unlocked_user)):
     """Withdraw funds from user account with temporary lock"""
     if amount <= 0:
         raise HTTPException(status_code=400, detail="Amount must be positive")
     
-    # Check user lock status
-    is_locked = await betting_service.get_user_lock_status(user_id)
-    if is_locked:
-        raise HTTPException(status_code=423, detail="Account temporarily locked due to recent withdrawal")
-    
     # This would normally check if the user has sufficient balance
     # For this example, we'll just trigger the lock mechanism
     result = await betting_service.withdraw_money(user_id, amount)
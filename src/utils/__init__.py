@@ -4,5 +4,7 @@ from .helpers import (
     format_currency,
     validate_outcome_prediction,
     get_sport_outcomes,
-    SportType
-)
\ No newline at end of file
+    SportType,
+    Outcome
+)
+from .cache import ResponseCache, admin_cache
\ No newline at end of file
@@ -0,0 +1,36 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+
+class ResponseCache:
+    """In-process TTL cache for slowly-changing responses"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}  # key -> (expires_at, value)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> Any:
+        """Store a value for the configured TTL and return it"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def clear(self):
+        """Drop all entries (called when the underlying data changes)"""
+        self._entries.clear()
+
+
+# Global cache for the admin read endpoints
+admin_cache = ResponseCache(ttl=settings.admin_cache_ttl)
\ No newline at end of file
@@ -1,10 +1,12 @@
 import random
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Tuple, FrozenSet, Sequence
+from types import MappingProxyType
+from functools import lru_cache
 from enum import Enum
 
 
-class SportType(Enum):
+class SportType(str, Enum):
     FOOTBALL = "football"
     BASKETBALL = "basketball"
     TENNIS = "tennis"
@@ -12,27 +14,52 @@ class SportType(Enum):
     VOLLEYBALL = "volleyball"
 
 
+class Outcome(str, Enum):
+    TEAM_A_WON = "team_a_won"
+    TEAM_B_WON = "team_b_won"
+    DRAW = "draw"
+    PLAYER1 = "player1"
+    PLAYER2 = "player2"
+    OVERTIME = "overtime"
+
+
+_TEAMS = (
+    "Team A", "Team B", "Team C", "Team D", "Team E", "Team F",
+    "Lions", "Tigers", "Bears", "Eagles", "Wolves", "Sharks",
+    "Dragons", "Phoenix", "Hawks", "Falcons", "Ravens", "Owls",
+    "Giants", "Warriors", "Knights", "Raiders", "Pirates", "Vikings"
+)
+
+
+# Possible outcomes per sport (read-only, built once)
+_OUTCOMES_MAP = MappingProxyType({
+    "football": ("team_a_won", "team_b_won", "draw"),
+    "basketball": ("team_a_won", "team_b_won"),
+    "tennis": ("player1", "player2"),
+    "hockey": ("team_a_won", "team_b_won", "overtime"),
+    "volleyball": ("team_a_won", "team_b_won")
+})
+_DEFAULT_OUTCOMES = ("team_a_won", "team_b_won", "draw")
+_SPORT_PAIRS = tuple((s.value, s.value.title()) for s in SportType)  # (value, title-cased value)
+
+
 def generate_random_event(sport_type: SportType = None) -> Dict:
     """Generate a random sports event"""
-    if not sport_type:
-        sport_type = random.choice(list(SportType))
+    if sport_type:
+        sport, sport_title = sport_type.value, sport_type.value.title()
+    else:
+        # Plain strings chosen directly, no enum attribute lookups
+        sport, sport_title = random.choice(_SPORT_PAIRS)
     
-    teams = [
-        "Team A", "Team B", "Team C", "Team D", "Team E", "Team F", 
-        "Lions", "Tigers", "Bears", "Eagles", "Wolves", "Sharks",
-        "Dragons", "Phoenix", "Hawks", "Falcons", "Ravens", "Owls",
-        "Giants", "Warriors", "Knights", "Raiders", "Pirates", "Vikings"
-    ]
+    # Two distinct teams in one call
+    team1, team2 = random.sample(_TEAMS, 2)
     
-    team1 = random.choice(teams)
-    team2 = random.choice([t for t in teams if t != team1])
-    
-    event_name = f"{sport_type.value.title()} Match: {team1} vs {team2}"
+    event_name = f"{sport_title} Match: {team1} vs {team2}"
     
     return {
         "name": event_name,
-        "sport_type": sport_type.value,
-        "description": f"Upcoming {sport_type.value} match between {team1} and {team2}",
+        "sport_type": sport,
+        "description": f"Upcoming {sport} match between {team1} and {team2}",
         "start_time": datetime.utcnow() + timedelta(hours=random.randint(1, 48)),
         "is_active": True,
         "is_finished": False
@@ -51,6 +78,12 @@ def calculate_dynamic_odds(base_probability: float, market_bias: float = 0.0) ->
     if base_probability <= 0 or base_probability >= 1:
         raise ValueError("Probability must be between 0 and 1 (exclusive)")
     
+    return _compute_dynamic_odds(base_probability, market_bias)
+
+
+@lru_cache(maxsize=4096)
+def _compute_dynamic_odds(base_probability: float, market_bias: float) -> float:
+    """Odds math behind calculate_dynamic_odds, memoized on the exact inputs (already validated)"""
     # Convert probability to fair odds
     fair_odds = 1.0 / base_probability
     
@@ -68,24 +101,27 @@ def calculate_dynamic_odds(base_probability: float, market_bias: float = 0.0) ->
     return round(final_odds, 2)
 
 
+# Bound format methods for the common currencies
+_CURRENCY_FORMATTERS = {c: f"{{:.2f}} {c}".format for c in ("USD", "EUR", "GBP", "JPY")}
+
+
 def format_currency(amount: float, currency: str = "USD") -> str:
     """Format currency with proper symbols"""
-    return f"{amount:.2f} {currency}"
+    formatter = _CURRENCY_FORMATTERS.get(currency)
+    return formatter(amount) if formatter else f"{amount:.2f} {currency}"
+
 
+@lru_cache(maxsize=32)
+def _lower_set(outcomes: Tuple[str, ...]) -> FrozenSet[str]:
+    """Lowercased outcomes as a frozenset (memoized per outcomes tuple)"""
+    return frozenset(o.lower() for o in outcomes)
 
-def validate_outcome_prediction(outcome: str, valid_outcomes: List[str]) -> bool:
+
+def validate_outcome_prediction(outcome: str, valid_outcomes: Sequence[str]) -> bool:
     """Validate if the predicted outcome is valid for the event"""
-    return outcome.lower() in [o.lower() for o in valid_outcomes]
+    return outcome.lower() in _lower_set(tuple(valid_outcomes))
 
 
-def get_sport_outcomes(sport_type: str) -> List[str]:
+def get_sport_outcomes(sport_type: str) -> Tuple[str, ...]:
     """Get possible outcomes for a given sport type"""
-    outcomes_map = {
-        "football": ["team_a_won", "team_b_won", "draw"],
-        "basketball": ["team_a_won", "team_b_won"],
-        "tennis": ["player1", "player2"],
-        "hockey": ["team_a_won", "team_b_won", "overtime"],
-        "volleyball": ["team_a_won", "team_b_won"]
-    }
-    
-    return outcomes_map.get(sport_type.lower(), ["team_a_won", "team_b_won", "draw"])
\ No newline at end of file
+    return _OUTCOMES_MAP.get(sport_type.lower(), _DEFAULT_OUTCOMES)
\ No newline at end of file